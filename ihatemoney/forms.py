@@ -1,9 +1,10 @@
 from datetime import datetime
-from re import match
+from operator import attrgetter
+import re
 
 import email_validator
 from flask import request
-from flask_babel import lazy_gettext as _
+from flask_babel import get_locale, lazy_gettext as _
 from flask_wtf.file import FileAllowed, FileField, FileRequired
 from flask_wtf.form import FlaskForm
 from jinja2 import Markup
@@ -28,6 +29,18 @@ from ihatemoney.utils import (
     slugify,
 )
 
+_AMOUNT_RE = re.compile(r"^[ 0-9.+\-*/()]{0,200}\Z")
+# Plain decimal numbers, written the way eval_arithmetic_expression accepts them
+_DECIMAL_RE = re.compile(r"(0|[1-9][0-9]*)(\.[0-9]*)?|\.[0-9]+")
+# Cheap syntax check, to reject obvious junk before calling email_validator
+_EMAIL_SYNTAX_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+\Z")
+
+# Placeholder shown in the project edit form instead of the (hashed) password
+UNCHANGED_PASSWORD = "**unchanged**"
+
+# Localized currency choices, keyed by locale, label style and currency list
+_CURRENCY_CHOICES_CACHE = {}
+
 
 def strip_filter(string):
     try:
@@ -36,6 +49,33 @@ def strip_filter(string):
         return string
 
 
+def comma_to_dot(value):
+    """Return value as a string, using dots as decimal separators"""
+    if not isinstance(value, str):
+        value = str(value)
+    if "," in value:
+        value = value.replace(",", ".")
+    return value
+
+
+def get_currency_choices(currencies, detailed=True):
+    """Return the (code, label) choices for the given currencies, rendered
+    for the current locale.
+
+    Rendering the labels goes through Babel for every currency, so the result
+    is cached per locale.
+    """
+    key = (str(get_locale()), detailed, tuple(currencies))
+    choices = _CURRENCY_CHOICES_CACHE.get(key)
+    if choices is None:
+        choices = [
+            (currency_name, render_localized_currency(currency_name, detailed))
+            for currency_name in currencies
+        ]
+        _CURRENCY_CHOICES_CACHE[key] = choices
+    return choices
+
+
 def get_billform_for(project, set_default=True, **kwargs):
     """Return an instance of BillForm configured for a particular project.
 
@@ -49,12 +89,10 @@ def get_billform_for(project, set_default=True, **kwargs):
 
     show_no_currency = form.original_currency.data == CurrencyConverter.no_currency
 
-    form.original_currency.choices = [
-        (currency_name, render_localized_currency(currency_name, detailed=False))
-        for currency_name in form.currency_helper.get_currencies(
-            with_no_currency=show_no_currency
-        )
-    ]
+    form.original_currency.choices = get_currency_choices(
+        form.currency_helper.get_currencies(with_no_currency=show_no_currency),
+        detailed=False,
+    )
 
     active_members = [(m.id, m.name) for m in project.active_members]
 
@@ -72,7 +110,7 @@ class CommaDecimalField(DecimalField):
 
     def process_formdata(self, value):
         if value:
-            value[0] = str(value[0]).replace(",", ".")
+            value[0] = comma_to_dot(value[0])
         return super(CommaDecimalField, self).process_formdata(value)
 
 
@@ -89,17 +127,49 @@ class CalculatorStringField(StringField):
                 "Only numbers and + - * / operators "
                 "are accepted."
             )
-            value = str(valuelist[0]).replace(",", ".")
+            value = comma_to_dot(valuelist[0])
 
             # avoid exponents to prevent expensive calculations i.e 2**9999999999**9999999
-            if not match(r"^[ 0-9\.\+\-\*/\(\)]{0,200}$", value) or "**" in value:
+            if "**" in value or not _AMOUNT_RE.match(value):
                 raise ValueError(Markup(message))
 
-            valuelist[0] = str(eval_arithmetic_expression(value))
+            # Most amounts are plain numbers, no need to parse an expression.
+            # Integers are kept as is, like eval_arithmetic_expression would do.
+            if _DECIMAL_RE.fullmatch(value):
+                if "." in value:
+                    valuelist[0] = str(float(value))
+                else:
+                    valuelist[0] = value
+            else:
+                valuelist[0] = str(eval_arithmetic_expression(value))
 
         return super(CalculatorStringField, self).process_formdata(valuelist)
 
 
+class LazyChoicesSelectField(SelectField):
+    """
+    A SelectField whose choices are only built, by calling choices_fn,
+    when the field is rendered or validated
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(LazyChoicesSelectField, self).__init__(*args, **kwargs)
+        self.choices_fn = None
+
+    def load_choices(self):
+        if self.choices_fn is not None:
+            self.choices = self.choices_fn()
+            self.choices_fn = None
+
+    def iter_choices(self):
+        self.load_choices()
+        return super(LazyChoicesSelectField, self).iter_choices()
+
+    def pre_validate(self, form):
+        self.load_choices()
+        return super(LazyChoicesSelectField, self).pre_validate(form)
+
+
 class EditProjectForm(FlaskForm):
     name = StringField(_("Project name"), validators=[DataRequired()])
     password = StringField(_("Private code"), validators=[DataRequired()])
@@ -107,14 +177,17 @@ class EditProjectForm(FlaskForm):
     project_history = BooleanField(_("Enable project history"))
     ip_recording = BooleanField(_("Use IP tracking for project history"))
     currency_helper = CurrencyConverter()
-    default_currency = SelectField(_("Default Currency"), validators=[DataRequired()],)
+    default_currency = LazyChoicesSelectField(
+        _("Default Currency"), validators=[DataRequired()],
+    )
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, allow_unchanged_password=False, **kwargs):
         super().__init__(*args, **kwargs)
-        self.default_currency.choices = [
-            (currency_name, render_localized_currency(currency_name, detailed=True))
-            for currency_name in self.currency_helper.get_currencies()
-        ]
+        # Only the web edit view shows the UNCHANGED_PASSWORD placeholder
+        self.allow_unchanged_password = allow_unchanged_password
+        self.default_currency.choices_fn = lambda: get_currency_choices(
+            self.currency_helper.get_currencies()
+        )
 
     @property
     def logging_preference(self):
@@ -146,8 +219,15 @@ class EditProjectForm(FlaskForm):
         """Update the project with the information from the form"""
         project.name = self.name.data
 
-        # Only update password if changed to prevent spurious log entries
-        if not check_password_hash(project.password, self.password.data):
+        # Only update password if changed to prevent spurious log entries.
+        # The placeholder lets us skip the (deliberately slow) hash check
+        # when the field was left untouched.
+        password_unchanged = (
+            self.allow_unchanged_password and self.password.data == UNCHANGED_PASSWORD
+        )
+        if not password_unchanged and not check_password_hash(
+            project.password, self.password.data
+        ):
             project.password = generate_password_hash(self.password.data)
 
         project.contact_email = self.contact_email.data
@@ -175,8 +255,9 @@ class ProjectForm(EditProjectForm):
         # WTForms Boolean Fields don't insert the default value when the
         # request doesn't include any value the way that other fields do,
         # so we'll manually do it here
-        self.project_history.data = LoggingMode.default() != LoggingMode.DISABLED
-        self.ip_recording.data = LoggingMode.default() == LoggingMode.RECORD_IP
+        default_mode = LoggingMode.default()
+        self.project_history.data = default_mode != LoggingMode.DISABLED
+        self.ip_recording.data = default_mode == LoggingMode.RECORD_IP
         return super().save()
 
     def validate_id(form, field):
@@ -206,7 +287,9 @@ class PasswordReminder(FlaskForm):
     submit = SubmitField(_("Send me the code by email"))
 
     def validate_id(form, field):
-        if not Project.query.get(field.data):
+        # Keep the project around so the view doesn't have to look it up again
+        form.project = Project.query.get(field.data)
+        if not form.project:
             raise ValidationError(_("This project does not exists"))
 
 
@@ -246,7 +329,9 @@ class BillForm(FlaskForm):
         bill.what = self.what.data
         bill.external_link = self.external_link.data
         bill.date = self.date.data
-        bill.owers = [Person.query.get(ower, project) for ower in self.payed_for.data]
+        bill.owers = Person.query.filter(
+            Person.project_id == project.id, Person.id.in_(self.payed_for.data)
+        ).all()
         bill.original_currency = self.original_currency.data
         bill.converted_amount = self.currency_helper.exchange_currency(
             bill.amount, bill.original_currency, project.default_currency
@@ -259,7 +344,9 @@ class BillForm(FlaskForm):
         bill.what = self.what
         bill.external_link = ""
         bill.date = self.date
-        bill.owers = [Person.query.get(ower, project) for ower in self.payed_for]
+        bill.owers = Person.query.filter(
+            Person.project_id == project.id, Person.id.in_(self.payed_for)
+        ).all()
         bill.original_currency = CurrencyConverter.no_currency
         bill.converted_amount = self.currency_helper.exchange_currency(
             bill.amount, bill.original_currency, project.default_currency
@@ -274,7 +361,7 @@ class BillForm(FlaskForm):
         self.external_link.data = bill.external_link
         self.original_currency.data = bill.original_currency
         self.date.data = bill.date
-        self.payed_for.data = [int(ower.id) for ower in bill.owers]
+        self.payed_for.data = list(map(attrgetter("id"), bill.owers))
 
         self.original_currency.label = Label("original_currency", _("Currency"))
         self.original_currency.description = _(
@@ -335,9 +422,13 @@ class InviteForm(FlaskForm):
     submit = SubmitField(_("Send invites"))
 
     def validate_emails(form, field):
-        for email in [email.strip() for email in form.emails.data.split(",")]:
+        for email in form.emails.data.split(","):
+            email = email.strip()
             try:
-                email_validator.validate_email(email)
+                if not _EMAIL_SYNTAX_RE.match(email):
+                    raise email_validator.EmailNotValidError()
+                # Don't check the domain, it would mean one DNS query per address
+                email_validator.validate_email(email, check_deliverability=False)
             except email_validator.EmailNotValidError:
                 raise ValidationError(
                     _("The email %(email)s is not valid", email=email)
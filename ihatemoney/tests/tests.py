@@ -18,6 +18,7 @@ from werkzeug.security import check_password_hash, generate_password_hash
 
 from ihatemoney import history, models, utils
 from ihatemoney.currency_convertor import CurrencyConverter
+from ihatemoney.forms import UNCHANGED_PASSWORD, BillForm
 from ihatemoney.manage import DeleteProject, GenerateConfig, GeneratePasswordHash
 from ihatemoney.run import create_app, db, load_configuration
 from ihatemoney.versioning import LoggingMode
@@ -497,6 +498,45 @@ class BudgetTestCase(IhatemoneyTestCase):
         zorglub = models.Project.query.get("raclette").members[-1]
         self.assertTrue(zorglub.has_bills())
 
+    def test_bill_owers_from_other_project(self):
+        self.post_project("tartiflette")
+        self.login("tartiflette")
+        self.client.post("/tartiflette/members/add", data={"name": "alexis"})
+        alexis = models.Project.query.get("tartiflette").members[-1]
+
+        self.post_project("raclette")
+        self.login("raclette")
+        self.client.post("/raclette/members/add", data={"name": "zorglub"})
+        self.client.post("/raclette/members/add", data={"name": "fred"})
+        raclette = models.Project.query.get("raclette")
+        zorglub = models.Person.query.get_by_name("zorglub", raclette)
+        fred = models.Person.query.get_by_name("fred", raclette)
+
+        # members of another project can't be selected in the form
+        self.client.post(
+            "/raclette/add",
+            data={
+                "date": "2011-08-10",
+                "what": "fromage à raclette",
+                "payer": zorglub.id,
+                "payed_for": [zorglub.id, alexis.id],
+                "amount": "25",
+            },
+        )
+        self.assertEqual(models.Bill.query.count(), 0)
+
+        # and they are left out when saving, as are duplicates
+        with self.app.test_request_context():
+            form = BillForm(meta={"csrf": False})
+            form.payer.data = zorglub.id
+            form.amount.data = "25"
+            form.what.data = "fromage à raclette"
+            form.date.data = datetime.date(2011, 8, 10)
+            form.original_currency.data = CurrencyConverter.no_currency
+            form.payed_for.data = [zorglub.id, zorglub.id, fred.id, alexis.id]
+            bill = form.save(models.Bill(), raclette)
+        self.assertCountEqual(bill.owers, [zorglub, fred])
+
     def test_member_delete_method(self):
         self.post_project("raclette")
         self.login("raclette")
@@ -891,12 +931,31 @@ class BudgetTestCase(IhatemoneyTestCase):
         self.assertEqual(project.default_currency, new_data["default_currency"])
         self.assertTrue(check_password_hash(project.password, new_data["password"]))
 
+        # The edit form shows a placeholder, which keeps the current password
+        resp = self.client.get("/raclette/edit")
+        self.assertIn(f'value="{UNCHANGED_PASSWORD}"', resp.data.decode("utf-8"))
+
+        new_data["password"] = UNCHANGED_PASSWORD
+        resp = self.client.post("/raclette/edit", data=new_data, follow_redirects=True)
+        self.assertEqual(resp.status_code, 200)
+        project = models.Project.query.get("raclette")
+        self.assertTrue(check_password_hash(project.password, "didoudida"))
+
         # Editing a project with a wrong email address should fail
         new_data["contact_email"] = "wrong_email"
 
         resp = self.client.post("/raclette/edit", data=new_data, follow_redirects=True)
         self.assertIn("Invalid email address", resp.data.decode("utf-8"))
 
+        # Editing a project with an unknown currency should fail
+        new_data["contact_email"] = "zorglub@notmyidea.org"
+        new_data["default_currency"] = "ZZZ"
+
+        resp = self.client.post("/raclette/edit", data=new_data, follow_redirects=True)
+        self.assertIn("Not a valid choice", resp.data.decode("utf-8"))
+        project = models.Project.query.get("raclette")
+        self.assertEqual(project.default_currency, "USD")
+
     def test_dashboard(self):
         # test that the dashboard is deactivated by default
         resp = self.client.post(
@@ -1713,6 +1772,21 @@ class APITestCase(IhatemoneyTestCase):
         decoded_resp = json.loads(resp.data.decode("utf-8"))
         self.assertDictEqual(decoded_resp, expected)
 
+        # an unknown currency should be refused
+        resp = self.client.put(
+            "/api/projects/raclette",
+            data={
+                "contact_email": "yeah@notmyidea.org",
+                "default_currency": "ZZZ",
+                "password": "raclette",
+                "name": "The raclette party",
+            },
+            headers=self.get_auth("raclette"),
+        )
+
+        self.assertEqual(400, resp.status_code)
+        self.assertIn("default_currency", json.loads(resp.data.decode("utf-8")))
+
         # password change is possible via API
         resp = self.client.put(
             "/api/projects/raclette",
@@ -1732,9 +1806,30 @@ class APITestCase(IhatemoneyTestCase):
         )
         self.assertEqual(200, resp.status_code)
 
+        # the web edit form placeholder has no special meaning in the API
+        resp = self.client.put(
+            "/api/projects/raclette",
+            data={
+                "contact_email": "yeah@notmyidea.org",
+                "default_currency": "USD",
+                "password": UNCHANGED_PASSWORD,
+                "name": "The raclette party",
+            },
+            headers=self.get_auth("raclette", "tartiflette"),
+        )
+
+        self.assertEqual(200, resp.status_code)
+
+        resp = self.client.get(
+            "/api/projects/raclette",
+            headers=self.get_auth("raclette", UNCHANGED_PASSWORD),
+        )
+        self.assertEqual(200, resp.status_code)
+
         # delete should work
         resp = self.client.delete(
-            "/api/projects/raclette", headers=self.get_auth("raclette", "tartiflette")
+            "/api/projects/raclette",
+            headers=self.get_auth("raclette", UNCHANGED_PASSWORD),
         )
 
         # get should return a 401 on an unknown resource
@@ -2050,6 +2145,8 @@ class APITestCase(IhatemoneyTestCase):
             ("((100 + 200.25) * 2 - 100) / 2", 250.25),
             ("3/2", 1.5),
             ("2 + 1 * 5 - 2 / 1", 5),
+            ("12.50", 12.5),
+            ("10", 10),
         ]
 
         for i, pair in enumerate(input_expected):
@@ -2110,6 +2207,9 @@ class APITestCase(IhatemoneyTestCase):
             "20/0",  # invalid calc
             "9999**99999999999999999",  # exponents
             "2" * 201,  # greater than 200 chars,
+            " 5",  # leading space
+            "+5",  # unary plus
+            "007",  # leading zeros
         ]
 
         for amount in erroneous_amounts:
@@ -2126,6 +2226,12 @@ class APITestCase(IhatemoneyTestCase):
             )
             self.assertStatus(400, req)
 
+        # plain numbers are shown back the way the evaluator writes them
+        for amount, expected in [("10", "10"), ("12.50", "12.5"), ("1,5", "1.5")]:
+            with self.app.test_request_context(method="POST", data={"amount": amount}):
+                form = BillForm(meta={"csrf": False})
+                self.assertEqual(form.amount.data, expected)
+
     def test_statistics(self):
         # create a project
         self.api_create("raclette")
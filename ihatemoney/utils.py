@@ -2,6 +2,7 @@ import ast
 import csv
 from datetime import datetime, timedelta
 from enum import Enum
+from functools import lru_cache
 from io import BytesIO, StringIO
 from json import JSONEncoder, dumps
 import operator
@@ -226,6 +227,8 @@ class IhmJSONEncoder(JSONEncoder):
             return JSONEncoder.default(self, o)
 
 
+# Amounts are often the same few strings, avoid parsing them again and again
+@lru_cache(maxsize=1024)
 def eval_arithmetic_expression(expr):
     def _eval(node):
         # supported operators
@@ -38,6 +38,7 @@ from werkzeug.security import check_password_hash, generate_password_hash
 
 from ihatemoney.currency_convertor import CurrencyConverter
 from ihatemoney.forms import (
+    UNCHANGED_PASSWORD,
     AdminAuthenticationForm,
     AuthenticationForm,
     EditProjectForm,
@@ -335,8 +336,7 @@ def remind_password():
     form = PasswordReminder()
     if request.method == "POST":
         if form.validate():
-            # get the project
-            project = Project.query.get(form.id.data)
+            project = form.project
             # send a link to reset the password
             remind_message = Message(
                 "password recovery",
@@ -395,7 +395,7 @@ def reset_password():
 
 @main.route("/<project_id>/edit", methods=["GET", "POST"])
 def edit_project():
-    edit_form = EditProjectForm()
+    edit_form = EditProjectForm(allow_unchanged_password=True)
     import_form = UploadForm()
     # Import form
     if import_form.validate_on_submit():
@@ -428,6 +428,7 @@ def edit_project():
         return redirect(url_for("main.list_bills"))
     else:
         edit_form.name.data = g.project.name
+        edit_form.password.data = UNCHANGED_PASSWORD
 
         if g.project.logging_preference != LoggingMode.DISABLED:
             edit_form.project_history.data = True